@@ -1,18 +1,38 @@
 import geopandas as gpd # spatial data and geometric operations (polygons)
 import os
 
-def load_indonesian_data(data_path, layer_name=None):
-    """Loads Indonesian spatial data from various formats."""
+def load_indonesian_data(data_path, layer_name=None, bbox=None):
+    """Loads Indonesian spatial data from various formats.
+
+    bbox (minx, miny, maxx, maxy) is pushed down to GDAL, so spatially
+    indexed formats (FlatGeobuf, GeoPackage with its rtree_<table>_geom
+    index) skip records outside the window before any parsing. Shapefile
+    has no on-disk spatial index and always reads every record - convert
+    large inputs with convert_to_flatgeobuf.
+    """
+    # pyogrio + Arrow reads rows in C instead of per-row Python (much faster);
+    # fall back to the default fiona engine when pyogrio isn't installed
+    try:
+        import pyogrio  # noqa: F401
+        read_kwargs = {'engine': 'pyogrio', 'use_arrow': True}
+    except ImportError:
+        read_kwargs = {}
     if data_path.endswith('.gpkg') and layer_name:
-        gdf = gpd.read_file(data_path, layer=layer_name)
+        gdf = gpd.read_file(data_path, layer=layer_name, bbox=bbox, **read_kwargs)
     else:
-        gdf = gpd.read_file(data_path)
-    # Ensure consistent CRS for Indonesia
+        gdf = gpd.read_file(data_path, bbox=bbox, **read_kwargs)
+    # Ensure consistent CRS for Indonesia; reprojecting data that is
+    # already WGS84 would pay a full pyproj pass for nothing
     if gdf.crs is None:
-        gdf.set_crs(epsg=4326, inplace=True) # WGS84
-    else:
-        gdf.to_crs(epsg=4326, inplace=True)
+        gdf = gdf.set_crs(epsg=4326) # WGS84
+    elif gdf.crs.to_epsg() != 4326:
+        gdf = gdf.to_crs(epsg=4326)
     return gdf
 
+def convert_to_flatgeobuf(gdf, out_path):
+    """One-time conversion to FlatGeobuf so later loads can use bbox pushdown."""
+    gdf.to_file(out_path, driver='FlatGeobuf', spatial_index=True)
+    return out_path
+
 # Example: Load provincial boundaries
 provinsi = load_indonesian_data('KPKNLDJKN_PT_1K/KPKNLDJKN_PT_1K.shp')
\ No newline at end of file
@@ -13,6 +13,41 @@ def gdf_to_postgis(gdf, table_name, engine, if_exists='replace'):
     """Writes a GeoDataFrame to a PostGIS table."""
     gdf.to_postgis(table_name, engine, if_exists=if_exists, index=False)
 
+def gdf_to_postgis_copy(gdf, table_name, engine, if_exists='replace'):
+    """Bulk-loads a GeoDataFrame into PostGIS via COPY FROM STDIN.
+
+    COPY streams all rows in one statement instead of the per-row
+    INSERT batches used by to_postgis, so it is 10-100x faster for
+    any realistically sized IGT dataset.
+    """
+    import io
+    import shapely
+
+    # Create the (empty) table with the right geometry type and SRID
+    gdf.head(0).to_postgis(table_name, engine, if_exists=if_exists, index=False)
+
+    # Serialize geometry as hex WKB in one vectorized call. GeoPandas keeps
+    # the CRS on the array, not as a GEOS SRID per geometry, so stamp it on
+    # first or the COPY fails against the typmod column created above
+    geoms = gdf.geometry.values
+    if gdf.crs is not None:
+        geoms = shapely.set_srid(geoms, gdf.crs.to_epsg())
+    attr_cols = [c for c in gdf.columns if c != gdf.geometry.name]
+    buf = io.StringIO()
+    gdf[attr_cols].assign(
+        geometry=shapely.to_wkb(geoms, hex=True, include_srid=True)
+    ).to_csv(buf, index=False, header=False)
+    buf.seek(0)
+
+    cols = ', '.join(f'"{c}"' for c in attr_cols + [gdf.geometry.name])
+    raw_conn = engine.raw_connection()
+    try:
+        cur = raw_conn.cursor()
+        cur.copy_expert(f'COPY {table_name} ({cols}) FROM STDIN WITH CSV', buf)
+        raw_conn.commit()
+    finally:
+        raw_conn.close()
+
 def query_spatial_db(engine, query):
     """Executes a spatial SQL query and returns a GeoDataFrame."""
     return gpd.read_postgis(query, engine)
\ No newline at end of file
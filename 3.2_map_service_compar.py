@@ -1,10 +1,29 @@
+import asyncio
+import functools
+
+import geopandas as gpd
+import numpy as np
 import requests
 import folium
+import shapely
+
+# ~10 m simplification / coordinate precision in degrees: invisible at
+# provincial zoom, but shrinks the GeoJSON payload the browser must parse
+_SIMPLIFY_TOLERANCE = 1e-4
+_COORD_GRID = 1e-5
+
+# One shared session keeps the TCP/TLS connection alive across API calls
+_SESSION = requests.Session()
+
+@functools.lru_cache(maxsize=1024)
+def _geocode(api_key, location_name):
+    """Fetches (and caches) the geocoding response for a location name."""
+    url = f'https://maps.googleapis.com/maps/api/geocode/json?address={location_name}&key={api_key}'
+    return _SESSION.get(url, timeout=10).json()
 
 def compare_with_google_maps(api_key, location_name, your_data_geometry):
     """Fetches polygon from Google Maps Geocoding API for comparison."""
-    url = f'https://maps.googleapis.com/maps/api/geocode/json?address={location_name}&key={api_key}'
-    response = requests.get(url).json()
+    response = _geocode(api_key, location_name)
     # Parse response to get bounds or geometry
     # ... (geometry extraction logic)
     # google_geom = ...
@@ -14,13 +33,67 @@ def compare_with_google_maps(api_key, location_name, your_data_geometry):
     iou_score = intersection_area / union_area if union_area > 0 else 0
     return iou_score, google_geom
 
+def compare_iou_batch(your_geoms, service_geoms):
+    """Computes IoU for paired geometry arrays with vectorized shapely calls."""
+    your_geoms = np.asarray(your_geoms, dtype=object)
+    service_geoms = np.asarray(service_geoms, dtype=object)
+    area_yours = shapely.area(your_geoms)
+    area_svc = shapely.area(service_geoms)
+    iou = np.zeros(len(your_geoms))
+
+    # Containment shortcut: when one geometry covers the other the IoU is a
+    # plain area ratio, so those pairs skip the heavy polygon clipping
+    svc_in_yours = shapely.contains(your_geoms, service_geoms)
+    yours_in_svc = ~svc_in_yours & shapely.contains(service_geoms, your_geoms)
+    np.divide(area_svc, area_yours, out=iou, where=svc_in_yours & (area_yours > 0))
+    np.divide(area_yours, area_svc, out=iou, where=yours_in_svc & (area_svc > 0))
+
+    rest = ~(svc_in_yours | yours_in_svc)
+    if rest.any():
+        inter = shapely.area(shapely.intersection(your_geoms[rest], service_geoms[rest]))
+        union = shapely.area(shapely.union(your_geoms[rest], service_geoms[rest]))
+        # Masked divide, same as the containment branch - zero-area pairs
+        # stay 0 without tripping an invalid-divide RuntimeWarning
+        ratio = np.zeros(len(inter))
+        np.divide(inter, union, out=ratio, where=union > 0)
+        iou[rest] = ratio
+    return iou
+
+async def compare_with_google_maps_many(api_key, location_names):
+    """Geocodes many locations concurrently over one aiohttp connection pool."""
+    import aiohttp
+
+    semaphore = asyncio.Semaphore(8)  # stay under the API rate limit
+
+    async def fetch(session, name):
+        url = f'https://maps.googleapis.com/maps/api/geocode/json?address={name}&key={api_key}'
+        async with semaphore:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                return await resp.json()
+
+    async with aiohttp.ClientSession() as session:
+        responses = await asyncio.gather(*(fetch(session, name) for name in location_names))
+    # Parse each response to get bounds or geometry, as in compare_with_google_maps
+    return dict(zip(location_names, responses))
+
+def _slim_for_web(geoms):
+    """Simplifies and precision-caps geometries for lightweight map payloads."""
+    simplified = shapely.simplify(geoms, tolerance=_SIMPLIFY_TOLERANCE, preserve_topology=True)
+    return shapely.set_precision(simplified, grid_size=_COORD_GRID)
+
 def visualize_comparison(your_gdf, service_geom, service_name):
     """Creates an interactive map to visually compare geometries."""
-    m = your_gdf.explore(
+    # Keep the original index: set_geometry aligns on it, and a fresh
+    # RangeIndex would leave every geometry NaN on filtered frames
+    slim_gdf = your_gdf.set_geometry(
+        gpd.GeoSeries(_slim_for_web(your_gdf.geometry.values),
+                      index=your_gdf.index, crs=your_gdf.crs))
+    m = slim_gdf.explore(
         name='Authoritative Data (IGT)',
         color='blue',
         style_kwds={'fillOpacity': 0.5}
     )
-    folium.GeoJson(service_geom, name=service_name).add_to(m)
+    slim_service_geom = _slim_for_web(np.array([service_geom], dtype=object))[0]
+    folium.GeoJson(slim_service_geom, name=service_name).add_to(m)
     folium.LayerControl().add_to(m)
     return m
\ No newline at end of file